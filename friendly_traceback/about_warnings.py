@@ -85,7 +85,7 @@ class WarningInfo:
         self.info["lang"] = session.lang
         self.info["generic"] = get_generic_explanation(self.warning_type)
         short_filename = path_utils.shorten_path(self.filename)
-        if "[" in short_filename:
+        if short_filename.startswith("["):
             location = _(
                 "Warning issued on line `{line}` of code block {filename}."
             ).format(filename=short_filename, line=self.lineno)
@@ -139,13 +139,20 @@ def detailed_tb(info: Info) -> str:  # Special case
     """Unlike the normal information from 'where()', which focus on at
     most two frames, detailed_tb() gives information for all the frames.
     It is used mostly in IPython based environment - especially with
-    the 'button-based' mode in Jupyter notebooks/lab."""
+    the 'button-based' mode in Jupyter notebooks/lab.
+
+    For a RecursionError with a long traceback, only the first five and
+    last five frames are included; an entry with an empty source, shown
+    as a "More lines not shown" marker, replaces the frames in between.
+    """
     if "detailed_tb" not in info:
         return ""
     result = [""]
     spacing = {"location": " " * 4, "var_info": " " * 8}
     for location, source, var_info in info["detailed_tb"]:
         result.append(spacing["location"] + location)
+        if not source:  # marker for omitted frames
+            continue
         result.extend(iter(source.split("\n")))
         result.extend(spacing["var_info"] + line for line in var_info.split("\n"))
     return "\n".join(result)
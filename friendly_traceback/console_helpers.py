@@ -21,7 +21,7 @@ functions are available in such environments, do the following::
 """
 
 # NOTE: __all__ is defined at the very bottom of this file
-import inspect
+import builtins
 import sys
 import types
 from typing import Any, Callable, Dict, List, Optional, Type, Union
@@ -160,23 +160,23 @@ def what(
         explain(index=exception_or_index, include="what")
         return
 
-    if inspect.isclass(exception_or_index) and issubclass(
-        exception_or_index, BaseException
-    ):
-        result = get_generic_explanation(exception_or_index)
+    if isinstance(exception_or_index, type):
+        exc = exception_or_index
+    elif isinstance(exception_or_index, str) and hasattr(builtins, exception_or_index):
+        # Most common case: the name of a builtin exception; no need to eval.
+        exc = getattr(builtins, exception_or_index)
     else:
         try:
             exc = eval(exception_or_index)  # skipcq PYL-W0123
-            if inspect.isclass(exc) and issubclass(exc, BaseException):
-                result = get_generic_explanation(exc)
-            else:
-                result = _("{exception} is not an exception.").format(
-                    exception=f"`{exception_or_index}`"
-                )
         except Exception:  # noqa
-            result = _("{exception} is not an exception.").format(
-                exception=f"`{exception_or_index}`"
-            )
+            exc = None
+
+    if isinstance(exc, type) and issubclass(exc, BaseException):
+        result = get_generic_explanation(exc)
+    else:
+        result = _("{exception} is not an exception.").format(
+            exception=f"`{exception_or_index}`"
+        )
 
     if pre:  # for documentation # pragma: no cover
         lines = result.split("\n")
@@ -483,9 +483,9 @@ class FriendlyHelpers:
         parts = [self.true_repr() + "\n" + header + "\n\n"]
         for name in basic_helpers:
             parts.append(name + "(): ")
-            fn = self.helpers[name]
-            if hasattr(fn, "help"):
-                parts.append(fn.help() + "\n")
+            help_ = getattr(self.helpers[name], "help", None)
+            if help_ is not None:
+                parts.append(help_() + "\n")
             else:
                 print("Warning:", name, "has no help() method.")
 
@@ -494,9 +494,9 @@ class FriendlyHelpers:
             parts.append("\n" + more_header + "\n\n")
             for name in _debug_helpers:
                 parts.append(name + "(): ")
-                fn = self.helpers[name]
-                if hasattr(fn, "help"):
-                    parts.append(fn.help() + "\n")
+                help_ = getattr(self.helpers[name], "help", None)
+                if help_ is not None:
+                    parts.append(help_() + "\n")
                 else:
                     print("Warning:", name, "has no help() method.")
         return "".join(parts)
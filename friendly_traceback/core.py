@@ -8,10 +8,11 @@ time. If functions defined in friendly_traceback.__init__.py do not meet your ne
 please file an issue.
 """
 
+import itertools
 import re
 import traceback
 import types
-from typing import List, Optional, Type
+from typing import Dict, List, Optional, Tuple, Type
 
 from . import debug_helper, info_generic, info_variables, message_parser, tb_data
 from .frame_info import FrameInfo
@@ -30,6 +31,9 @@ TracebackData = tb_data.TracebackData
 
 _ = current_lang.translate
 
+# File paths never contain '"' in practice: using [^"]* avoids backtracking.
+_FILE_LINE_RE = re.compile(r'^  File "([^"]*)", ([^,]*)')
+
 # ====================
 # The following is an example of a formatted traceback, with
 # some parts identified with (partial) names used below
@@ -122,7 +126,16 @@ class FriendlyTraceback:
             debug_helper.handle_internal_error(str(e))
             raise SystemExit
         self.tb = tb
-        self.suppressed = ["       ... " + _("More lines not shown.") + " ..."]
+        # The same file often appears in many records, especially for
+        # RecursionError; we only need to shorten its path once.
+        self._short_paths: Dict[str, Tuple[str, str]] = {}
+        # The last frame is analyzed by both locate_exception_raised()
+        # and get_detailed_stack_info().
+        self._var_info: Dict[Tuple[int, str], Dict[str, str]] = {}
+        # Python's traceback does not change when recompile_info() is called.
+        self._python_tb: Optional[Tuple[List[str], str]] = None
+        # Set only if a caller assigns its own marker to suppressed.
+        self._suppressed: Optional[List[str]] = None
         self.info = {
             "header": _("Python exception:"),  # Used by HackInScience
             "lang": session.lang,
@@ -143,6 +156,7 @@ class FriendlyTraceback:
         exc_name = etype.__name__
         message = value.msg if hasattr(value, "msg") else self.tb_data.full_message
         self.info["message"] = f"{exc_name}: {message}\n"
+        self.tb_data.str_failed = tb_data.STR_FAILED in self.info["message"]
         return self.info["message"]
 
     def compile_info(self) -> None:
@@ -153,9 +167,7 @@ class FriendlyTraceback:
         self.assign_cause()
         self.assign_location()
         # removing null values; mypy cannot figure out the type correctly here
-        to_remove = [key for key in self.info if not self.info[key]]  # type: ignore
-        for key in to_remove:
-            del self.info[key]
+        self.info = {key: val for key, val in self.info.items() if val}  # type: ignore
 
     def recompile_info(self) -> None:
         """This is useful if we need to redisplay some information in a
@@ -163,12 +175,62 @@ class FriendlyTraceback:
         """
         from .config import session
 
+        self._short_paths.clear()
+        self._var_info.clear()
         self.info["header"] = _("Python exception:")
         self.info["lang"] = session.lang
         self.add_exception_note()
         self.assign_tracebacks()
         self.compile_info()
 
+    @property
+    def suppressed(self) -> List[str]:
+        """Marker used in place of lines removed from long tracebacks.
+        It is only translated when a traceback actually needs to be shortened,
+        and always uses the current language, unless a marker has been
+        assigned to it.
+        """
+        if self._suppressed is not None:
+            return self._suppressed
+        return ["       ... " + _("More lines not shown.") + " ..."]
+
+    @suppressed.setter
+    def suppressed(self, value: List[str]) -> None:
+        self._suppressed = value
+
+    def shorten_path(self, path: str) -> str:
+        """Memoized version of path_utils.shorten_path."""
+        return self.classify_path(path)[0]
+
+    def classify_path(self, path: str) -> Tuple[str, str]:
+        """Returns the shortened path together with its kind, which is one of
+
+        * "unavailable": "<unknown>" or "<string>", whose content cannot be analyzed
+        * "code_block": a code block, such as those used by IPython or Mu
+        * "file": everything else
+        """
+        try:
+            return self._short_paths[path]
+        except KeyError:
+            short_path = path_utils.shorten_path(path)
+            if short_path in ("<unknown>", "<string>"):
+                kind = "unavailable"
+            elif short_path and short_path.startswith("["):
+                kind = "code_block"
+            else:
+                kind = "file"
+            result = self._short_paths[path] = (short_path, kind)
+            return result
+
+    def get_var_info(self, line: str, frame: types.FrameType) -> Dict[str, str]:
+        """Memoized version of info_variables.get_var_info."""
+        key = (id(frame), line)
+        try:
+            return self._var_info[key]
+        except KeyError:
+            var_info = self._var_info[key] = info_variables.get_var_info(line, frame)
+            return var_info
+
     def add_exception_note(self):
         """Adding information from exception notes; new to Python 3.11"""
         if not hasattr(self.tb_data.exception_instance, "__notes__"):
@@ -194,13 +256,13 @@ class FriendlyTraceback:
             if self.tb_data.filename == "<unknown>" or (
                 self.tb_data.filename == "<string>"
                 and self.tb_data.value.lineno != 1
-                and not issubclass(self.tb_data.exception_type, SyntaxError)
+                and not self.tb_data.is_syntax_error
             ):
                 return
         except Exception:
             return
 
-        if tb_data.STR_FAILED in self.message:
+        if self.tb_data.str_failed:
             self.info["cause"] = _(
                 "Warning: improperly formed exception.\n"
                 "I suspect that a custom exception has been raised\n"
@@ -208,7 +270,7 @@ class FriendlyTraceback:
                 "This can occur if a `__repr__` or a `__str__` method\n"
                 "raises an exception or does not return a string.\n"
             )
-        elif issubclass(self.tb_data.exception_type, SyntaxError):
+        elif self.tb_data.is_syntax_error:
             self.set_cause_syntax()
         else:
             self.set_cause_runtime()
@@ -245,8 +307,8 @@ class FriendlyTraceback:
 
         the latter being the "hint" appended to the friendly traceback.
         """
-        etype = self.tb_data.exception_type
         value = self.tb_data.value
+        exc_name = self.tb_data.exception_name
 
         if self.tb_data.filename == "<unknown>":
             return
@@ -255,13 +317,13 @@ class FriendlyTraceback:
             self.info["cause"] = _("The encoding of the file was not valid.\n")
             return
 
-        if etype.__name__ == "IndentationError":
+        if exc_name == "IndentationError":
             self.info["cause"] = indentation_error.set_cause_indentation_error(
                 value, self.tb_data.statement
             )
             return
 
-        if etype.__name__ == "TabError":
+        if exc_name == "TabError":
             return
 
         cause = analyze_syntax.set_cause_syntax(value, self.tb_data)
@@ -291,13 +353,13 @@ class FriendlyTraceback:
         For other types of exceptions, self.locate_exception_raised(),
         and possibly self.locate_last_call().
         """
-        if issubclass(self.tb_data.exception_type, SyntaxError):
+        if self.tb_data.is_syntax_error:
             self.locate_parsing_error()
             return
 
         records = self.tb_data.records
         if not records:  # pragma: no cover
-            if issubclass(self.tb_data.exception_type, MemoryError):
+            if self.tb_data.is_memory_error:
                 return
             debug_helper.log("No record in assign_location().")
             return
@@ -306,7 +368,14 @@ class FriendlyTraceback:
         if len(records) < 2:
             return
 
-        self.info["detailed_tb"] = self.get_detailed_stack_info()
+        truncated = self.tb_data.is_recursion_error and len(records) > 12
+        if truncated:
+            # Analyzing every frame would be costly and not more informative.
+            records = records[:5] + records[-5:]
+        self.info["detailed_tb"] = self.get_detailed_stack_info(records)
+        if truncated:
+            # Use the same marker as for the shortened traceback.
+            self.info["detailed_tb"].insert(5, (self.suppressed[0].strip(), "", ""))
         _ignore, partial_source, var_info = self.info["detailed_tb"][0]
         self.locate_last_call(records[0], partial_source, var_info)
 
@@ -328,9 +397,9 @@ class FriendlyTraceback:
         source = record.partial_source_with_node_range
         if source.strip() == "0:":
             source = ""
-        filename = path_utils.shorten_path(record.filename)
+        filename, kind = self.classify_path(record.filename)
 
-        unavailable = filename in ["<unknown>", "<string>"]
+        unavailable = kind == "unavailable"
         if unavailable:
             self.info["exception_raised_source"] = _(
                 "{filename} is not a regular Python file whose contents can be analyzed.\n"
@@ -340,7 +409,7 @@ class FriendlyTraceback:
                     "If you used `exec`, consider using `friendly_exec` instead.\n"
                 )
 
-        if session.ipython_prompt and filename.startswith("["):
+        if session.ipython_prompt and kind == "code_block":
             self.info["exception_raised_header"] = _(
                 "Exception raised on line `{linenumber}` of code block {filename}.\n"
             ).format(linenumber=record.lineno, filename=filename)
@@ -364,7 +433,7 @@ class FriendlyTraceback:
         else:  # This almost never happens
             line = record.problem_line()
 
-        var_info = info_variables.get_var_info(line, record.frame)
+        var_info = self.get_var_info(line, record.frame)
         self.info["exception_raised_variables"] = var_info["var_info"]
         if "additional_variable_warning" in var_info:
             self.info["additional_variable_warning"] = var_info[
@@ -378,9 +447,9 @@ class FriendlyTraceback:
         * exception_raised_source
         * last_call_variables
         """
-        filename = path_utils.shorten_path(record.filename)
+        filename, kind = self.classify_path(record.filename)
 
-        if filename and "[" in filename:
+        if kind == "code_block":
             self.info["last_call_header"] = _(
                 "Execution stopped on line `{linenumber}` of code block {filename}.\n"
             ).format(linenumber=record.lineno, filename=filename)
@@ -393,30 +462,30 @@ class FriendlyTraceback:
         if var_info:
             self.info["last_call_variables"] = var_info
 
-    def get_detailed_stack_info(self):
+    def get_detailed_stack_info(
+        self, records: List[FrameInfo]
+    ) -> List[Tuple[str, str, str]]:
         # sourcery skip: use-named-expression
         if self.tb_data.filename == "<stdin>":
             return []
 
-        detailed_tb = []
-        for record in self.tb_data.records:
-            filename = path_utils.shorten_path(record.filename)
-            lineno = record.lineno
+        code_block_location = _("Code block {filename}, line `{line}`")
+        file_location = _("File '{filename}', line `{line}`")
+        detailed_tb: List[Tuple[str, str, str]] = []
+        append = detailed_tb.append
+        for record in records:
+            filename, kind = self.classify_path(record.filename)
             if record.node_info:
                 _node, _ignore, line = record.node_info
             else:
                 line = record.problem_line()
-            partial_source = record.partial_source_with_node_range
-            var_info = info_variables.get_var_info(line, record.frame)
-            if "[" in filename:
-                location = _("Code block {filename}, line `{line}`").format(
-                    filename=filename, line=lineno
-                )
-            else:
-                location = _("File '{filename}', line `{line}`").format(
-                    filename=filename, line=lineno
-                )
-            detailed_tb.append((location, partial_source, var_info["var_info"]))
+            var_info = self.get_var_info(line, record.frame)
+            location = (
+                code_block_location if kind == "code_block" else file_location
+            ).format(filename=filename, line=record.lineno)
+            append(
+                (location, record.partial_source_with_node_range, var_info["var_info"])
+            )
         return detailed_tb
 
     def locate_parsing_error(self) -> None:
@@ -438,9 +507,9 @@ class FriendlyTraceback:
         statement.format_statement()
         partial_source = statement.formatted_partial_source
 
-        short_filename = path_utils.shorten_path(filepath)
+        short_filename, kind = self.classify_path(filepath)
 
-        if short_filename and "[" in short_filename:
+        if kind == "code_block":
             could_not_understand = _(
                 "Python could not understand the code in the code block {filename}\n"
             ).format(filename=short_filename)
@@ -495,15 +564,18 @@ class FriendlyTraceback:
             self.info["original_python_traceback"] = tb
             return
 
-        # full_tb includes code from friendly-traceback itself
-        full_tb = [line.rstrip() for line in self.tb_data.formatted_tb]
-        python_tb = self.create_traceback(self.tb_data.python_records)
+        # For RecursionError, only the first and last two frames are shown.
+        max_frames = 5 if self.tb_data.is_recursion_error else None
+        python_tb = self.create_traceback(self.tb_data.python_records, max_frames)
         tb = self.create_traceback(self.tb_data.records)
         shortened_tb = self.shorten(tb)
 
         header = "Traceback (most recent call last):"  # not included in records
-        if full_tb[0].startswith(header) and self.tb_data.filename is not None:
-            if not issubclass(self.tb_data.exception_type, SyntaxError):
+        if (
+            self.tb_data.formatted_tb[0].startswith(header)
+            and self.tb_data.filename is not None
+        ):
+            if not self.tb_data.is_syntax_error:
                 shortened_tb.insert(0, header)
                 python_tb.insert(0, header)
             else:
@@ -511,23 +583,22 @@ class FriendlyTraceback:
                 # a SyntaxError occurs at an interactive prompt.
                 # In this case, the filename will normally be of the form "<...>"
                 # or we will have changed "File" to be "Code block"
-                for line in shortened_tb:
-                    if line.startswith("  File") and "<" not in line:
-                        # We have a true file in the traceback
-                        shortened_tb.insert(0, header)
-                        python_tb.insert(0, header)
-                        break
-
-        if "RecursionError" in full_tb[-1]:
-            if len(shortened_tb) > 12:
-                shortened_tb = shortened_tb[:5] + self.suppressed + shortened_tb[-5:]
-            if len(python_tb) > 12:
-                python_tb = python_tb[:5] + self.suppressed + python_tb[-5:]
+                if any(
+                    line.startswith("  File") and "<" not in line
+                    for line in shortened_tb
+                ):
+                    # We have a true file in the traceback
+                    shortened_tb.insert(0, header)
+                    python_tb.insert(0, header)
 
         exc = self.tb_data.value
         chain_info = ""
         short_chain_info = ""
-        if exc.__cause__ or exc.__context__:
+        # With "raise ... from None", there is a context but no chain to show.
+        has_chain = exc.__cause__ is not None or (
+            exc.__context__ is not None and not exc.__suppress_context__
+        )
+        if has_chain:
             chain_info = process_exception_chain(self.tb_data.exception_type, exc)
             parts = chain_info.split("\n\n")
             # suppress line
@@ -537,21 +608,37 @@ class FriendlyTraceback:
                 temp.append(part)
             short_chain_info = "\n\n".join(temp)
 
-        self.info["simulated_python_traceback"] = (
-            chain_info + "\n".join(python_tb) + "\n"
+        # Ending each list with an empty string ensures that the joined
+        # tracebacks end with "\n" without requiring another concatenation.
+        python_tb.append("")
+        shortened_tb.append("")
+        python_traceback = "\n".join(python_tb)
+        self.info["simulated_python_traceback"] = chain_info + python_traceback
+        self.info["original_python_traceback"] = (
+            chain_info + self.get_original_python_tb()
         )
-        self.info["original_python_traceback"] = chain_info + "\n".join(full_tb) + "\n"
         # The following is needed for some determining the cause in at
         # least one case.
         # skipcq: PYL-W0201
-        self.tb_data.simulated_python_traceback = "\n".join(python_tb) + "\n"
+        self.tb_data.simulated_python_traceback = python_traceback
 
+        shortened_traceback = "\n".join(shortened_tb)
         if session.include_chained_exception:
-            self.info["shortened_traceback"] = (
-                short_chain_info + "\n".join(shortened_tb) + "\n"
-            )
+            self.info["shortened_traceback"] = short_chain_info + shortened_traceback
         else:
-            self.info["shortened_traceback"] = "\n".join(shortened_tb) + "\n"
+            self.info["shortened_traceback"] = shortened_traceback
+
+    def get_original_python_tb(self) -> str:
+        """Returns the traceback formatted by Python, which includes code
+        from friendly-traceback itself, without trailing spaces on each part.
+        The result is cached so that it is not recomputed by recompile_info(),
+        unless formatted_tb has been replaced.
+        """
+        formatted_tb = self.tb_data.formatted_tb
+        if self._python_tb is None or self._python_tb[0] is not formatted_tb:
+            python_tb = "\n".join(line.rstrip() for line in formatted_tb) + "\n"
+            self._python_tb = (formatted_tb, python_tb)
+        return self._python_tb[1]
 
     def shorten(self, tb: List[str]) -> List[str]:
         """Shortens a traceback (as list of lines)
@@ -559,41 +646,51 @@ class FriendlyTraceback:
         and by using short synonyms for some common directories."""
         from .config import session
 
-        shortened_tb = tb[:2] + self.suppressed + tb[-5:] if len(tb) > 12 else tb[:]
-        pattern = re.compile(r'^  File "(.*)", ')  # noqa
-        temp = []
-        for line in shortened_tb:
-            match = re.search(pattern, line)
+        lines = (
+            itertools.chain(tb[:2], self.suppressed, tb[-5:]) if len(tb) > 12 else tb
+        )
+        ipython_prompt = session.ipython_prompt
+        match_file_line = _FILE_LINE_RE.match
+        temp: List[str] = []
+        append = temp.append
+        for line in lines:
+            match = match_file_line(line)
             if match:
                 filename = match[1]
-                short_filename = path_utils.shorten_path(filename)
-                line = line.replace(filename, short_filename)
+                short_filename = self.shorten_path(filename)
                 if (
-                    session.ipython_prompt
+                    ipython_prompt
                     and short_filename[0] == "["
                     and short_filename[-1] == "]"
                 ):
-                    line = line.replace("  File", "  Code block")
-                    line = line.replace('"[', "[").replace(']"', "]")
-                    parts = line.split(",")
-                    line = ",".join(parts[:2])
-            temp.append(line)
+                    # Only keep the line number: '  Code block [n], line m'
+                    line = f"  Code block {short_filename}, {match[2]}"
+                else:
+                    line = line.replace(filename, short_filename)
+            append(line)
         return temp
 
-    def create_traceback(self, records: List[FrameInfo]) -> List[str]:
+    def create_traceback(
+        self, records: List[FrameInfo], max_frames: Optional[int] = None
+    ) -> List[str]:
         """Using records that exclude code from certain files,
         creates a list from which a standard-looking traceback can
         be created.
+
+        If there are more than ``max_frames`` records, only the first
+        and last ``max_frames // 2`` are included.
         """
-        result = []
-        for record in records:
-            result.append(
-                f'  File "{record.filename}", line {record.lineno}, in {record.code.co_name}'
+        if max_frames is not None and len(records) > max_frames:
+            nb_kept = max_frames // 2
+            result = (
+                format_records(records[:nb_kept])
+                + self.suppressed
+                + format_records(records[-nb_kept:])
             )
-            bad_line = record.problem_line()
-            result.append(f"    {bad_line.strip()}")
+        else:
+            result = format_records(records)
 
-        if issubclass(self.tb_data.exception_type, SyntaxError):
+        if self.tb_data.is_syntax_error:
             value = self.tb_data.value
             offset = value.offset
             filename = value.filename
@@ -640,11 +737,20 @@ class FriendlyTraceback:
         return result
 
 
+def format_records(records: List[FrameInfo]) -> List[str]:
+    """Formats records as they would appear in a Python traceback."""
+    # Two lines per record: the location, followed by the code.
+    result: List[str] = [""] * (2 * len(records))
+    result[::2] = [
+        f'  File "{record.filename}", line {record.lineno}, in {record.code.co_name}'
+        for record in records
+    ]
+    result[1::2] = [f"    {record.problem_line().strip()}" for record in records]
+    return result
+
+
 def process_exception_chain(etype: Type[_E], value: _E) -> str:
     """Obtains info about exceptions raised while treating other exceptions."""
-    seen = set()
-    lines = []
-
     direct_cause = (
         "The above exception was the direct cause of the following exception:"
     )
@@ -652,30 +758,37 @@ def process_exception_chain(etype: Type[_E], value: _E) -> str:
         "During handling of the above exception, another exception occurred:"
     )
 
-    def chain_exc(typ: Type[_E], exc: _E, tb: Optional[types.TracebackType]) -> None:
-        """Recursive function that insert the contents of 'lines' above."""
-        seen.add(id(exc))
-        context = exc.__context__
+    # Walk the chain iteratively, from the most recent exception to the
+    # oldest, so that a long chain cannot exceed the recursion limit.
+    seen = {id(value)}
+    chain = []
+    exc: BaseException = value
+    while True:
         cause = exc.__cause__
+        context = exc.__context__
         if cause is not None and id(cause) not in seen:
-            chain_exc(type(cause), cause, cause.__traceback__)
-            lines.append(f"\n    {direct_cause}\n\n")
+            exc = cause
+            separator = direct_cause
         elif (
             context is not None
             and not exc.__suppress_context__
             and id(context) not in seen
         ):
-            chain_exc(type(context), context, context.__traceback__)
-            lines.append(f"\n    {another_exception}\n\n")
+            exc = context
+            separator = another_exception
+        else:
+            break
+        seen.add(id(exc))
+        chain.append((exc, separator))
+
+    lines = []
+    for exc, separator in reversed(chain):
+        tb = exc.__traceback__
         if tb:
-            tbe = traceback.extract_tb(tb)
             lines.append("Traceback (most recent call last):\n")
-            for line in traceback.format_list(tbe):
-                lines.append(line)
-            for line in traceback.format_exception_only(typ, exc):
-                lines.append(line)
-
-    chain_exc(etype, value, None)
+            lines.extend(traceback.format_list(traceback.extract_tb(tb)))
+            lines.extend(traceback.format_exception_only(type(exc), exc))
+        lines.append(f"\n    {separator}\n\n")
     return "".join(lines)
 
 
@@ -1,8 +1,10 @@
-import os
-from typing import Iterable
+import ast
+import functools
+import sys
+import types
+from typing import Iterable, List, Optional, Tuple
 
 import stack_data
-from executing import only
 from stack_data import LINE_GAP, BlankLineRange, BlankLines, Formatter, Line, Options
 from stack_data.utils import cached_property
 
@@ -22,6 +24,9 @@ class FriendlyFormatter(Formatter):
     ):
         self.indent = "    "
         super().__init__(**kwargs)
+        # Line prefixes, before the line number, used for every line
+        self.current_prefix = self.indent + self.current_line_indicator
+        self.other_prefix = self.indent + " " * len(self.current_line_indicator)
 
     def format_frame_source(self, frame: stack_data.FrameInfo) -> Iterable[str]:
         for line in frame.lines:
@@ -34,31 +39,26 @@ class FriendlyFormatter(Formatter):
                 yield self.indent + self.line_gap_string + "\n"
 
     def format_line(self, line: Line) -> str:
-        result = self.indent
-        if line.is_current:
-            result += self.current_line_indicator
-        else:
-            result += " " * len(self.current_line_indicator)
-        result += self.line_number_format_string.format(line.lineno)
-        prefix = result
-        result += line.render() + "\n"
+        prefix = (
+            self.current_prefix if line.is_current else self.other_prefix
+        ) + self.line_number_format_string.format(line.lineno)
+        parts = [prefix, line.render(), "\n"]
 
+        offset = len(prefix) - line.leading_indent
         for line_range in line.executing_node_ranges:
-            start = line_range.start - line.leading_indent
-            end = line_range.end - line.leading_indent
+            start = line_range.start + offset
+            end = line_range.end + offset
             # if end <= start, we have an empty line inside a highlighted
             # block of code. In this case, we need to avoid inserting
             # an extra blank line with no markers present.
             if end > start:
-                result += (
-                    " " * (start + len(prefix))
-                    + self.executing_node_underline * (end - start)
-                    + "\n"
+                parts.extend(
+                    (" " * start, self.executing_node_underline * (end - start), "\n")
                 )
-        return result
+        return "".join(parts)
 
     def format_blank_lines_linenumbers(self, blank_line):
-        result = self.indent + " " * len(self.current_line_indicator)
+        result = self.other_prefix
         if blank_line.begin_lineno == blank_line.end_lineno:
             return (
                 result
@@ -68,68 +68,77 @@ class FriendlyFormatter(Formatter):
         return result + "{}\n".format(self.line_number_gap_string)
 
 
+@functools.lru_cache(maxsize=None)
+def get_formatter(nb_digits: int) -> FriendlyFormatter:
+    """Returns a formatter for line numbers having at most nb_digits digits.
+
+    Formatters do not depend on the frame being formatted, so a single
+    one is created for each width of line numbers.
+    """
+    return FriendlyFormatter(
+        options=Options(blank_lines=BlankLines.SINGLE),
+        line_number_format_string="{:%d}| " % nb_digits,  # noqa
+        line_gap_string=" " * nb_digits + "(...)",
+        line_number_gap_string=" " * (nb_digits - 1) + ":",
+    )
+
+
 class FrameInfo(stack_data.FrameInfo):
     @cached_property
     def partial_source(self) -> str:
-        return self._partial_source(with_node_range=False)
+        return self._partial_source()
 
     @cached_property
     def partial_source_with_node_range(self) -> str:
-        return self._partial_source(with_node_range=True)
+        # The executing node, if any, is always underlined by FriendlyFormatter.
+        return self.partial_source
 
-    def _partial_source(self, with_node_range: bool) -> str:
+    def _partial_source(self) -> str:
         """Gets the part of the source where an exception occurred,
         formatted in a pre-determined way, as well as the content
         of the specific line where the exception occurred.
         """
-        file_not_found = _("Problem: source of `{filename}` is not available\n").format(
-            filename=self.filename
-        )
         source = ""
 
         if not self.lines and self.filename:
             # protecting against https://github.com/alexmojaki/stack_data/issues/13
             try:
                 lineno = self.lineno
-                s_lines = cache.get_source_lines(self.filename)
-                self.lines = []  # noqa
-                with_node_range = False
-                linenumber = max(lineno - 2, 0)
-                for line in s_lines[linenumber : lineno + 1]:
-                    self.lines.append(FakeLineObject(line, linenumber, lineno))
-                    linenumber += 1
+                if self.filename in cache.unavailable:
+                    s_lines = ["\n"]  # same as get_source_lines() below
+                else:
+                    s_lines = cache.get_source_lines(self.filename)
+                    if len(s_lines) == 1:  # only the "\n" added
+                        # Avoid looking for a missing file again, possibly
+                        # in every directory of sys.path, for later tracebacks.
+                        cache.unavailable.add(self.filename)
+                start = max(lineno - 2, 0)
+                self.lines = [  # noqa
+                    FakeLineObject(line, linenumber, lineno)
+                    for linenumber, line in enumerate(
+                        s_lines[start : lineno + 1], start
+                    )
+                ]
+                self.__dict__.pop("highlighted_source", None)  # reset if computed
             except Exception as e:  # noqa
                 debug_helper.log_error(e)
 
         if self.lines:
-            source = self._highlighted_source(with_node_range)
-        elif self.filename and os.path.abspath(self.filename):
-            if self.filename not in ["<stdin>", "<string>"]:
-                # When filename is "<stdin>", "<string>",
-                # using a normal Python REPL - source unavailable.
-                # An appropriate error message will have been given via
-                # cannot_analyze_stdin
-                source = file_not_found
-                debug_helper.log("Problem in get_partial_source().")
-                debug_helper.log(file_not_found)
-        elif not self.filename:  # pragma: no cover
-            source = file_not_found
+            source = self.highlighted_source
+        elif self.filename not in ["<stdin>", "<string>"]:
+            # When filename is "<stdin>", "<string>",
+            # using a normal Python REPL - source unavailable.
+            # An appropriate error message will have been given via
+            # cannot_analyze_stdin
+            source = source_not_available(self.filename)
             debug_helper.log("Problem in get_partial_source().")
-            debug_helper.log(file_not_found)
-        else:  # pragma: no cover
-            debug_helper.log("Problem in get_partial_source().")
-            debug_helper.log("Should not have reached this option")
-            debug_helper.log_error()
+            debug_helper.log(source)
 
         if not source.endswith("\n"):
             source += "\n"
 
         return source
 
-    @cached_property
-    def highlighted_source(self) -> str:
-        return self._highlighted_source(with_node_range=False)
-
     def problem_line(self) -> str:
         if not self.lines:
             return ""
@@ -142,7 +151,8 @@ class FrameInfo(stack_data.FrameInfo):
                 return str(line_obj.text)
         return ""
 
-    def _highlighted_source(self, with_node_range: bool) -> str:
+    @cached_property
+    def highlighted_source(self) -> str:
         """Extracts a few relevant lines from a file content given as a list
         of lines, adding line number information and identifying
         a particular line.
@@ -160,25 +170,11 @@ class FrameInfo(stack_data.FrameInfo):
         lines = self.lines
 
         if not lines:
-            return "", ""
+            return ""
 
         nb_digits = len(str(lines[-1].lineno))
-        lineno_fmt_string = "{:%d}| " % nb_digits  # noqa
-        line_gap_string = " " * nb_digits + "(...)"
-        line_number_gap_string = " " * (nb_digits - 1) + ":"
-
         try:
-            new_lines = [
-                line
-                for line in FriendlyFormatter(
-                    options=Options(blank_lines=BlankLines.SINGLE),
-                    line_number_format_string=lineno_fmt_string,
-                    line_gap_string=line_gap_string,
-                    line_number_gap_string=line_number_gap_string,
-                ).format_frame_source(self)
-            ]
-
-            return "".join(new_lines)
+            return "".join(get_formatter(nb_digits).format_frame_source(self))
         except Exception:
             return "<NO SOURCE>"
 
@@ -219,13 +215,8 @@ class FrameInfo(stack_data.FrameInfo):
             if not node_text:
                 # Highlight the entire line
                 try:
-                    tokens = token_utils.tokenize(self.current_line.text)
-                    tokens = token_utils.remove_meaningless_tokens(tokens)
-                    return (
-                        None,
-                        (tokens[0].start_col, tokens[-1].end_col),
-                        self.current_line.text,
-                    )
+                    text = self.current_line.text
+                    return None, _significant_range(text), text
                 except Exception:
                     return None
 
@@ -242,37 +233,121 @@ class FrameInfo(stack_data.FrameInfo):
 
     @cached_property
     def current_line(self):
-        return only(
-            line for line in self.lines if isinstance(line, Line) and line.is_current
-        )
+        for line in self.lines:
+            if isinstance(line, Line) and line.is_current:
+                return line
+        raise ValueError(f"No current line found for {self.filename}")
 
     def handle_special_cases(self) -> str:
         """Hack to try to identify a problematic text when node_text is None.
 
         We just use the information to highlight where in a statement
-        the error is located.
+        the error is located.  This is only done for import statements,
+        which are analyzed without being executed again: we look for the
+        first module, or name imported from a module, that is not available.
         """
         try:
-            exec(self.current_line.text)
-        except Exception as exc:
-            saved_exc = exc
-        else:
-            return ""
-
-        if not hasattr(saved_exc, "msg"):
+            tree = ast.parse(self.current_line.text.strip())
+        except Exception:  # no current line, or incomplete statement
             return ""
-        message = saved_exc.msg
-        if message.startswith("cannot import name '"):
-            return message.split("'")[1]
-        elif message.startswith("No module named '"):
-            return message.split("'")[1]
 
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    missing = _first_missing_module(alias.name)
+                    if missing:
+                        return missing
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                missing = _first_missing_module(node.module)
+                if missing:
+                    return missing
+                module = sys.modules[node.module]
+                for alias in node.names:
+                    if alias.name == "*":
+                        continue
+                    if not (
+                        hasattr(module, alias.name)
+                        or f"{node.module}.{alias.name}" in sys.modules
+                    ):
+                        return alias.name
         return ""
 
 
+def _first_missing_module(dotted_name: str) -> str:
+    """Returns the first part of a dotted module name, like 'a' or 'a.b'
+    for 'a.b.c', which has not been imported, or an empty string."""
+    name = ""
+    for part in dotted_name.split("."):
+        name = f"{name}.{part}" if name else part
+        if name not in sys.modules:
+            return name
+    return ""
+
+
+class SimpleFrameInfo:
+    """Lightweight substitute for FrameInfo, used when stack_data cannot
+    analyze a traceback. Only the attributes needed to create a friendly
+    traceback are provided; the source line is read lazily from the cache.
+    """
+
+    node_info = None
+
+    def __init__(self, tb: types.TracebackType) -> None:
+        self.tb = tb
+        self.frame = tb.tb_frame
+        self.code = self.frame.f_code
+        self.filename = self.code.co_filename
+        self.lineno = tb.tb_lineno
+
+    @classmethod
+    def from_traceback(cls, tb: types.TracebackType) -> List["SimpleFrameInfo"]:
+        """Creates a record for each frame of a traceback, walking it
+        directly instead of using inspect.getinnerframes()."""
+        records = []
+        current: Optional[types.TracebackType] = tb
+        while current is not None:
+            records.append(cls(current))
+            current = current.tb_next
+        return records
+
+    def problem_line(self) -> str:
+        return cache.get_source_line(self.filename, self.lineno)
+
+    @property
+    def partial_source(self) -> str:
+        line = self.problem_line().rstrip()
+        if not line.strip():
+            return source_not_available(self.filename)
+        return f"    -->{self.lineno}| {line}\n"
+
+    @property
+    def partial_source_with_node_range(self) -> str:
+        return self.partial_source
+
+
+def source_not_available(filename: str) -> str:
+    return _("Problem: source of `{filename}` is not available\n").format(
+        filename=filename
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _significant_range(text: str) -> Tuple[int, int]:
+    """Returns the columns where the code on a line begins and ends,
+    ignoring indentation and comments.
+
+    The same line often appears in many frames, for example with
+    RecursionError, so the result is cached to avoid tokenizing it again.
+    """
+    tokens = token_utils.remove_meaningless_tokens(token_utils.tokenize(text))
+    return tokens[0].start_col, tokens[-1].end_col
+
+
 class FakeLineObject:
     """Class reproducing the minimum attributes for formatting lines"""
 
+    __slots__ = ("text", "lineno", "is_current")
+
     def __init__(self, line, linenumber, lineno):
         self.text = line
         self.lineno = linenumber + 1
@@ -50,7 +50,7 @@ def rich_displayhook(value: Any) -> None:
     """
     if value is None:
         return
-    if str(type(value)) == "<class 'function'>" and hasattr(value, "__rich_repr__"):
+    if isinstance(value, types.FunctionType) and hasattr(value, "__rich_repr__"):
         print(f"{value.__name__}(): {value.__rich_repr__()[0]}")
         return
     _old_displayhook(value)
@@ -22,7 +22,7 @@ gettext.translation() is the class-based API for gettext.
 
 import gettext
 import os
-from typing import Optional
+from typing import Dict, Optional
 
 from . import debug_helper
 from .typing_info import Translator
@@ -32,6 +32,8 @@ class LangState:
     def __init__(self) -> None:
         self._translate: Translator = lambda text: text
         self.lang = "en"
+        # Translations already done for the current language
+        self._translations: Dict[str, str] = {}
 
     def install(self, lang: Optional[str] = None) -> None:
         """Sets the language to be used for translations"""
@@ -65,12 +67,18 @@ class LangState:
 
         self.lang = lang
         self._translate = _lang.gettext
+        self._translations = {}
 
     def translate(self, text: str) -> str:
+        try:
+            return self._translations[text]
+        except KeyError:
+            pass
         translation = self._translate(text)
         if translation == text and self.lang == "fr":  # pragma: no cover
             debug_helper.log(f"Potentially untranslated text for {self.lang}:")
             debug_helper.log(text)
+        self._translations[text] = translation
         return translation
 
 
@@ -51,12 +51,12 @@ def add_help_attribute(
     """
     if description is None:
         description = short_description
-    for name in functions:
-        if name not in description:  # pragma: no cover
+    for name, func in functions.items():
+        help_ = description.get(name)
+        if help_ is None:  # pragma: no cover
             debug_helper.log(f"Missing description for {name}.")
             continue
-        func = functions[name]
-        setattr(func, "help", description[name])  # noqa
+        setattr(func, "help", help_)  # noqa
         setattr(
             func, "__rich_repr__", lambda func=func: (func.help(),)
         )  # pragma: no cover
@@ -8,7 +8,7 @@ which is intended to be part of the public API, but needs to be
 imported from this module instead of simply from ``friendly_traceback``.
 """
 
-import inspect
+import functools
 from typing import Any, Callable, Dict, Type
 
 from .ft_gettext import current_lang, no_information
@@ -21,6 +21,18 @@ _ = current_lang.translate
 
 def get_generic_explanation(exception_type: Type[BaseException]) -> str:
     """Provides a generic explanation about a particular exception."""
+    return _cached_explanation(exception_type, current_lang.lang)  # type: ignore
+
+
+# Explanations only depend on the exception type, the language used
+# and the content of GENERIC. The cache is bounded since exception classes
+# redefined in a console or a notebook would otherwise be kept alive.
+@functools.lru_cache(maxsize=128)
+def _cached_explanation(exception_type: Type[BaseException], lang: str) -> str:
+    return _get_generic_explanation(exception_type)
+
+
+def _get_generic_explanation(exception_type: Type[BaseException]) -> str:
     if hasattr(exception_type, "__name__"):
         exception_name = exception_type.__name__
     else:
@@ -30,34 +42,30 @@ def get_generic_explanation(exception_type: Type[BaseException]) -> str:
     else:
         if not issubclass(exception_type, BaseException):
             return no_information()
-        parents = inspect.getmro(exception_type)
+        parents = exception_type.__mro__
         for index, parent in enumerate(parents):
-            if parent in GENERIC:
-                tree = [p.__name__ for p in parents[: index + 1]]
+            describe = GENERIC.get(parent)
+            if describe is not None:
                 break
         else:
-            tree = [p.__name__ for p in parents]
-
-        for parent in parents:
-            if parent in GENERIC:
-                if parent.__name__.endswith("Warning"):
-                    explanation = _(
-                        "A warning of type `{name}` is a subclass of `{parent}`.\n"
-                    ).format(name=exception_name, parent=parent.__name__)
-                else:
-                    explanation = _(
-                        "An exception of type `{name}` is a subclass of `{parent}`.\n"
-                    ).format(name=exception_name, parent=parent.__name__)
-                nothing_specific = _(
-                    "Nothing more specific is known about `{name}`."
-                ).format(name=exception_name)
-                if len(tree) > 2:
-                    nothing_specific += "\n" + _(
-                        "The inheritance is as follows:\n\n" "    {tree}\n"
-                    ).format(tree=" -> ".join(tree))
-                return explanation + nothing_specific + "\n\n" + GENERIC[parent]()
-
-        return no_information()
+            return no_information()
+
+        if parent.__name__.endswith("Warning"):
+            explanation = _(
+                "A warning of type `{name}` is a subclass of `{parent}`.\n"
+            ).format(name=exception_name, parent=parent.__name__)
+        else:
+            explanation = _(
+                "An exception of type `{name}` is a subclass of `{parent}`.\n"
+            ).format(name=exception_name, parent=parent.__name__)
+        nothing_specific = _("Nothing more specific is known about `{name}`.").format(
+            name=exception_name
+        )
+        if index > 1:  # more than two classes in the inheritance tree
+            nothing_specific += "\n" + _(
+                "The inheritance is as follows:\n\n" "    {tree}\n"
+            ).format(tree=" -> ".join(p.__name__ for p in parents[: index + 1]))
+        return explanation + nothing_specific + "\n\n" + describe()
 
 
 def register(
@@ -84,6 +92,7 @@ def register(
             raise ValueError(message)
 
         GENERIC[error_class] = function
+        _cached_explanation.cache_clear()
 
         def wrapper():
             return function()
@@ -9,7 +9,7 @@ Note that we monkeypatch Python's linecache.getlines.
 import inspect
 import linecache
 import time
-from typing import Any, Dict, Generator, List, Optional
+from typing import Any, Dict, Generator, List, Optional, Set
 
 import stack_data
 
@@ -21,6 +21,8 @@ class Cache:
 
     def __init__(self) -> None:
         self.local_cache: Dict[str, List[str]] = {}
+        # Files for which no source could be found; see FrameInfo.
+        self.unavailable: Set[str] = set()
         self.context = 4
 
     def add(self, filename: str, source: str) -> None:
@@ -44,6 +46,7 @@ class Cache:
 
     def remove(self, filename: str) -> None:
         """Removes an entry from the cache if it can be found."""
+        self.unavailable.discard(filename)
         if filename in self.local_cache:
             del self.local_cache[filename]
         if filename in linecache.cache:
@@ -73,6 +76,23 @@ class Cache:
         # Do not use append; see #174.
         return lines + ["\n"]
 
+    def get_source_line(self, filename: str, lineno: Optional[int]) -> str:
+        """Given a filename, returns the line of source with the given
+        line number, consistent with ``get_source_lines(filename)[lineno - 1]``
+        but without copying the list of lines. An empty string is
+        returned if the line cannot be found.
+        """
+        if lineno is None:  # the line number is not always known
+            return ""
+        lines = old_getlines(filename)
+        if not lines:
+            lines = self.local_cache.get(filename, [])
+        if 1 <= lineno <= len(lines):
+            return lines[lineno - 1]
+        if lineno == len(lines) + 1:
+            return "\n"  # see get_source_lines
+        return ""
+
 
 cache = Cache()
 
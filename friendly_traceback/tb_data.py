@@ -1,16 +1,12 @@
-import contextlib
-import inspect
-import io
 import sys
 import traceback
 import types
-from itertools import dropwhile
-from typing import Generic, List, Optional, Tuple, Type
+from typing import Dict, Generic, List, Optional, Tuple, Type
 
 from stack_data import BlankLines, Options
 
 from . import debug_helper
-from .frame_info import FrameInfo
+from .frame_info import FrameInfo, SimpleFrameInfo
 from .ft_gettext import current_lang
 from .path_info import is_excluded_file
 from .source_cache import cache
@@ -33,21 +29,52 @@ def convert_value_to_message(value: BaseException) -> str:
     return message
 
 
-def retrieve_message(etype: Type[_E], value: _E, tb: types.TracebackType) -> str:
-    """Safely retrieves the message, including any additional hint from Python."""
-    message = convert_value_to_message(value)
+def retrieve_message(
+    etype: Type[_E],
+    value: _E,
+    tb: types.TracebackType,
+    message: Optional[str] = None,
+) -> str:
+    """Safely retrieves the message, including any additional hint from Python.
+
+    If it is already known, the result of convert_value_to_message()
+    can be passed as ``message`` so that it is not computed again.
+    """
+    if message is None:
+        message = convert_value_to_message(value)
     if (
         message == STR_FAILED
         or sys.version_info < (3, 10)
         or etype not in (AttributeError, NameError)
     ):
         return message
-    # 3.10+ hints are not directly accessible from Python.
+    if sys.version_info >= (3, 12):
+        # The traceback module computes the hints; lookup_lines=False
+        # avoids reading the source of every frame.
+        full_message = next(
+            traceback.TracebackException(
+                etype, value, tb, lookup_lines=False
+            ).format_exception_only()
+        )
+        return full_message.partition(":")[2].strip()
+    # For Python 3.10 and 3.11, hints are not directly accessible from Python.
+    import contextlib
+    import io
+
     err = io.StringIO()
     with contextlib.redirect_stderr(err):
         sys.__excepthook__(etype, value, tb)
-    full_message = err.getvalue().split("\n")[-2]
-    return full_message.split(":", 1)[1].strip()
+    # The message is on the last line; no need to split the entire traceback.
+    full_message = err.getvalue().rstrip("\n").rpartition("\n")[2]
+    return full_message.partition(":")[2].strip()
+
+
+def remove_space(text: str) -> str:
+    """Removes spaces at the end of a line, keeping the final newline if any."""
+    stripped = text.rstrip()
+    if stripped:
+        return stripped + "\n" if text.endswith("\n") else stripped
+    return text
 
 
 class TracebackData(Generic[_E]):
@@ -67,14 +94,29 @@ class TracebackData(Generic[_E]):
         cache.remove("<fstring>")
         self.exception_type = etype
         self.exception_name = etype.__name__
+        self.is_syntax_error = issubclass(etype, SyntaxError)
+        self.is_memory_error = issubclass(etype, MemoryError)
+        self.is_recursion_error = issubclass(etype, RecursionError)
         self.value = value
-        self.message = str(value)
-        self.full_message = retrieve_message(etype, value, tb)
+        # str(value) can be costly, or fail, for custom exceptions.
+        self.message = convert_value_to_message(value)
+        self.full_message = retrieve_message(etype, value, tb, self.message)
         self.formatted_tb = traceback.format_exception(etype, value, tb)
-        self.records = self.get_records(tb)
-        self.python_records = self.get_records(tb, python_excluded=False)
-        # The following attribute gets its value in core.py
+        # Analyzing the frames with stack_data is costly: it is done only once.
+        # For a MemoryError, lightweight records are used instead, as
+        # stack_data could fail for lack of memory.
+        all_records: List[FrameInfo] = (
+            SimpleFrameInfo.from_traceback(tb)  # type: ignore
+            if self.is_memory_error
+            else self.get_all_records(tb)
+        )
+        self.records = self.get_records(all_records)
+        self.python_records = self.get_records(all_records, python_excluded=False)
+        if self.is_memory_error:
+            self.records = self.analyze_shown_records(self.records)
+        # The following attributes get their value in core.py
         self.simulated_python_traceback: Optional[str] = None
+        self.str_failed = False
 
         # The following three attributes get their correct values in get_source_info()
         self.bad_line = "\n"
@@ -92,19 +134,13 @@ class TracebackData(Generic[_E]):
         self.node_range: Optional[Tuple[int, int]] = None
         self.program_stopped_node_range = None
 
-        if issubclass(etype, SyntaxError):
+        if self.is_syntax_error:
+            # Statements are not cached and reused: their attributes, and
+            # those of their tokens, are modified while finding the cause.
             self.statement: Optional[source_info.Statement] = source_info.Statement(
                 self.value, self.bad_line, self.original_bad_line
             )
             # Removing extra ending spaces for potentially shorter displays later on
-
-            def remove_space(text: str) -> str:
-                if text.rstrip():
-                    return (
-                        text.rstrip() + "\n" if text.endswith("\n") else text.rstrip()
-                    )
-                return text
-
             self.statement.entire_statement = remove_space(
                 self.statement.entire_statement
             )
@@ -113,53 +149,70 @@ class TracebackData(Generic[_E]):
             self.statement = None
             self.locate_error()
 
-    def get_records(
-        self, tb: types.TracebackType, python_excluded: bool = True
-    ) -> List[FrameInfo]:
-        """Get the traceback frame history, excluding those originating
-        from our own code that are included either at the beginning or
-        at the end of the traceback.
-        """
-
-        def trim_records(complete_records):
-            partial_records = list(
-                dropwhile(
-                    lambda record: is_excluded_file(
-                        record.filename, python_excluded=python_excluded
-                    ),
-                    complete_records,
-                )
-            )
-            partial_records.reverse()
-            partial_records = list(
-                dropwhile(
-                    lambda record: is_excluded_file(
-                        record.filename, python_excluded=python_excluded
-                    ),
-                    partial_records,
-                )
-            )
-            partial_records.reverse()
-            return partial_records
-
+    @staticmethod
+    def get_all_records(tb: types.TracebackType) -> List[FrameInfo]:
+        """Get the complete traceback frame history."""
         try:
-            all_records = list(
+            return list(
                 FrameInfo.stack_data(
                     tb,
                     Options(blank_lines=BlankLines.SINGLE),
                     collapse_repeated_frames=False,
                 )
             )
-            records = trim_records(all_records)
-            if records or issubclass(self.exception_type, (SyntaxError, MemoryError)):
-                return records
         except AssertionError:  # from stack_data
             # problems may arise when SyntaxErrors are raised
             # from a normal console like the one used in Mu.
-            all_records = inspect.getinnerframes(tb, cache.context)
-            records = trim_records(all_records)
-            if records or issubclass(self.exception_type, (SyntaxError, MemoryError)):
-                return records
+            return SimpleFrameInfo.from_traceback(tb)  # type: ignore
+
+    @staticmethod
+    def analyze_shown_records(records: List[FrameInfo]) -> List[FrameInfo]:
+        """Replaces the first and last lightweight records, whose source and
+        variables are shown by where(), by records analyzed with stack_data.
+        A lightweight record is kept if its analysis fails.
+        """
+        records = records[:]  # possibly shared with python_records
+        options = Options(blank_lines=BlankLines.SINGLE)
+        for index in {0, len(records) - 1} if records else ():
+            try:
+                records[index] = FrameInfo(records[index].tb, options)
+            except Exception as e:  # pragma: no cover
+                debug_helper.log("Could not analyze a frame for a MemoryError.")
+                debug_helper.log(str(e))
+        return records
+
+    def get_records(
+        self, all_records: List[FrameInfo], python_excluded: bool = True
+    ) -> List[FrameInfo]:
+        """Get the traceback frame history, excluding those originating
+        from our own code that are included either at the beginning or
+        at the end of the traceback.
+        """
+
+        # The same files typically appear many times in a traceback.
+        excluded: Dict[str, bool] = {}
+
+        def is_excluded(record: FrameInfo) -> bool:
+            filename = record.filename
+            if filename not in excluded:
+                excluded[filename] = is_excluded_file(
+                    filename, python_excluded=python_excluded
+                )
+            return excluded[filename]
+
+        # Only the first and last records need to be checked in the common
+        # case where the traceback does not include any excluded file.
+        begin = 0
+        end = len(all_records)
+        while begin < end and is_excluded(all_records[begin]):
+            begin += 1
+        while end > begin and is_excluded(all_records[end - 1]):
+            end -= 1
+        if begin == 0 and end == len(all_records):
+            return all_records  # nothing to trim: no need for a copy
+        records = all_records[begin:end]
+        if records or self.is_syntax_error or self.is_memory_error:
+            return records
         # If all the records are removed, it likely means that all the error
         # is in our own code - or that of the user who chose to exclude
         # some files. If so, we make sure to have something to analyze
@@ -170,7 +223,7 @@ class TracebackData(Generic[_E]):
         """Retrieves the file name and the line of code where the exception
         was raised.
         """
-        if issubclass(self.exception_type, SyntaxError):
+        if self.is_syntax_error:
             self.filename = self.value.filename
             # Python 3.10 introduced new arguments. For simplicity,
             # we give them some default values for other Python versions
@@ -200,9 +253,9 @@ class TracebackData(Generic[_E]):
 
             # this can happen with editors_helpers.check_syntax()
             try:
-                self.bad_line = cache.get_source_lines(self.filename)[
-                    self.value.lineno - 1
-                ]
+                self.bad_line = (
+                    cache.get_source_line(self.filename, self.value.lineno) or "\n"
+                )
             except Exception:  # noqa
                 self.bad_line = "\n"
             return
@@ -216,10 +269,8 @@ class TracebackData(Generic[_E]):
             self.bad_line = line
             # protecting against https://github.com/alexmojaki/stack_data/issues/13
             if not self.bad_line:
-                try:
-                    lines = cache.get_source_lines(record.filename)
-                    self.bad_line = lines[record.lineno - 1]
-                except Exception:  # noqa
+                self.bad_line = cache.get_source_line(record.filename, record.lineno)
+                if not self.bad_line:
                     debug_helper.log("Could not get bad_line")
 
             if len(self.records) > 1:
@@ -232,7 +283,7 @@ class TracebackData(Generic[_E]):
                 self.program_stopped_frame = self.exception_frame
             return
 
-        if issubclass(self.exception_type, MemoryError):
+        if self.is_memory_error:
             self.bad_line = "<not available>"
             return
 
@@ -250,7 +301,7 @@ class TracebackData(Generic[_E]):
         """Attempts to narrow down the location of the error so that,
         if possible, the problem code is highlighted with ^^^^."""
         if not self.records:  # pragma: no cover
-            if issubclass(self.exception_type, MemoryError):
+            if self.is_memory_error:
                 return
             debug_helper.log("No records in locate_error().")
             return
@@ -258,15 +309,19 @@ class TracebackData(Generic[_E]):
         node_info = self.records[-1].node_info  # noqa
         if node_info:
             self.node, _ignore, self.node_text = node_info
-            if self.node_text.strip():
+            node_text = self.node_text.strip()  # strip() is fix for 3.11beta
+            if node_text:
                 # Replacing the line that caused the exception by the text
                 # of the 'node' facilitates the process of identifying the cause.
-                self.bad_line = self.node_text.strip()  # strip() is fix for 3.11beta
+                self.bad_line = node_text
 
         # Also attempt to restrict the information about where the program
         # stopped to the strict minimum so that we don't show irrelevant
         # values of names
-        if self.records[0].node_info and self.records[0].node_info != node_info:
-            node, _ignore, node_text = self.records[0].node_info
+        if len(self.records) < 2:
+            return  # the program stopped where the exception was raised
+        first_node_info = self.records[0].node_info
+        if first_node_info and first_node_info != node_info:
+            node, _ignore, node_text = first_node_info
             if node_text.strip():
                 self.program_stopped_bad_line = node_text
@@ -0,0 +1,24 @@
+import gc
+import weakref
+
+from friendly_traceback.info_generic import get_generic_explanation
+
+
+def test_generic_explanation_cache_is_bounded():
+    class MyError(Exception):
+        pass
+
+    assert "`MyError` is a subclass of `Exception`" in get_generic_explanation(MyError)
+    ref = weakref.ref(MyError)
+    del MyError
+
+    # As when a class is redefined each time a notebook cell is run.
+    for _ in range(200):
+
+        class MyError(Exception):  # noqa
+            pass
+
+        get_generic_explanation(MyError)
+    del MyError
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,31 @@
+import friendly_traceback
+from friendly_traceback.config import session
+
+
+def raise_memory_error():
+    size = 10
+    raise MemoryError("Out of memory")
+
+
+def test_memory_error_location():
+    try:
+        raise_memory_error()
+    except MemoryError:
+        friendly_traceback.explain_traceback(redirect="capture")
+    result = friendly_traceback.get_output()
+    info = session.recorded_tracebacks[-1].info
+
+    assert "raise_memory_error()" in result
+    # The frames shown by where() are analyzed as for other exceptions.
+    raised_source = info["exception_raised_source"].splitlines()
+    assert raised_source[-2].endswith("|     size = 10")
+    assert raised_source[-1].startswith("    -->")
+    assert raised_source[-1].endswith('|     raise MemoryError("Out of memory")')
+    last_call_source = info["last_call_source"].splitlines()
+    index = next(i for i, line in enumerate(last_call_source) if "-->" in line)
+    assert last_call_source[index].endswith("|         raise_memory_error()")
+    assert last_call_source[index + 1].strip() == "^" * len("raise_memory_error()")
+    assert "exception_raised_header" in info
+    for key in ("simulated_python_traceback", "shortened_traceback"):
+        assert info[key].startswith("Traceback (most recent call last):")
+        assert ", in raise_memory_error" in info[key]
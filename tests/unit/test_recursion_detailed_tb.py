@@ -0,0 +1,24 @@
+import friendly_traceback
+from friendly_traceback.base_formatters import detailed_tb
+from friendly_traceback.config import session
+
+
+def recurse():
+    return recurse()
+
+
+def test_recursion_detailed_tb():
+    try:
+        recurse()
+    except RecursionError:
+        friendly_traceback.explain_traceback(redirect="capture")
+    friendly_traceback.get_output()
+    info = session.recorded_tracebacks[-1].info
+
+    # First five frames, the marker for omitted frames, last five frames
+    assert len(info["detailed_tb"]) == 11
+    marker = session.recorded_tracebacks[-1].suppressed[0].strip()
+    assert info["detailed_tb"][5] == (marker, "", "")
+    assert all(source for _, source, _ in info["detailed_tb"][:5])
+    assert all(source for _, source, _ in info["detailed_tb"][6:])
+    assert "    " + marker + "\n" in detailed_tb(info)
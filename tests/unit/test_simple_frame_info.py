@@ -0,0 +1,38 @@
+import friendly_traceback
+from friendly_traceback.frame_info import SimpleFrameInfo
+
+
+def test_simple_frame_info():
+    def inner():
+        return 1 / 0
+
+    try:
+        inner()
+    except ZeroDivisionError as e:
+        records = SimpleFrameInfo.from_traceback(e.__traceback__)
+
+    assert len(records) == 2
+    assert records[0].code.co_name == "test_simple_frame_info"
+    assert records[-1].code.co_name == "inner"
+    assert records[-1].problem_line().strip() == "return 1 / 0"
+    lineno = records[-1].lineno
+    assert records[-1].partial_source == f"    -->{lineno}|         return 1 / 0\n"
+    assert "1 / 0" in records[-1].partial_source_with_node_range
+    assert records[-1].node_info is None
+
+
+def test_stack_data_fallback(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError
+
+    monkeypatch.setattr(
+        friendly_traceback.frame_info.FrameInfo, "stack_data", classmethod(fail)
+    )
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        friendly_traceback.explain_traceback(redirect="capture")
+    result = friendly_traceback.get_output()
+
+    assert "ZeroDivisionError" in result
+    assert "Internal error" not in result
@@ -25,3 +25,22 @@ def test_With_fake_file():
     if friendly_traceback.get_lang() == "en":
         assert "<fake> is not a regular Python file" in result
         assert "Internal error" not in result
+
+
+def test_Missing_file_is_remembered():
+    from friendly_traceback.source_cache import cache
+
+    code = compile("1/0", "<missing>", "exec")
+    results = []
+    for _ in range(2):
+        try:
+            exec(code)
+        except ZeroDivisionError:
+            friendly_traceback.explain_traceback(redirect="capture")
+        results.append(friendly_traceback.get_output())
+        assert "<missing>" in cache.unavailable
+
+    assert results[0] == results[1]
+    cache.add("<missing>", "1/0")
+    assert "<missing>" not in cache.unavailable
+    cache.remove("<missing>")
@@ -0,0 +1,18 @@
+import friendly_traceback
+
+
+class BadStrError(Exception):
+    def __str__(self):
+        return 42
+
+
+def test_str_failed():
+    try:
+        raise BadStrError()
+    except BadStrError:
+        friendly_traceback.explain_traceback(redirect="capture")
+    result = friendly_traceback.get_output()
+
+    assert "BadStrError: <exception str() failed>" in result
+    if friendly_traceback.get_lang() == "en":
+        assert "Warning: improperly formed exception." in result
@@ -0,0 +1,17 @@
+import sys
+
+from friendly_traceback.core import FriendlyTraceback
+
+
+def test_suppressed_marker():
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        fr = FriendlyTraceback(*sys.exc_info())
+
+    assert "More lines not shown." in fr.suppressed[0]
+    fr.suppressed = ["    ..."]
+    assert fr.suppressed == ["    ..."]
+    # Instances still accept additional attributes, as they did before.
+    fr.custom = True
+    assert fr.custom